@@ -1,9 +1,11 @@
 import io
 import streamlit as st
 import pandas as pd
+import numpy as np
 import docx
 from docx.shared import Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
 import zipfile
 
 
@@ -25,6 +27,16 @@ COURSES = ['Introduction to the Profession',
            'Clinical Skills',
            'ILCE']
 FEEDBACK_TYPE = ['Large Group', 'Small Group']
+# Text in an evaluation title that identifies the type of feedback, checked in order
+FEEDBACK_TYPE_PATTERNS = [('Large Group', 'Large Group'), ('Workshop/Lab', 'Small Group')]
+# Text responses containing this are separator lines rather than comments
+COMMENT_SEPARATOR = '-----'
+# Low-cardinality columns that are filtered or grouped on are stored as categoricals
+FEEDBACK_DTYPES = {'QuestionType': 'category',
+                   'EvalTitle': 'category',
+                   'CourseName': 'category',
+                   'EvaluateeLast': 'category',
+                   'EvaluateeFirst': 'category'}
 
 
 def generate_feedback_info(df: pd.DataFrame) -> tuple[str, str, int]:
@@ -38,29 +50,44 @@ def generate_feedback_info(df: pd.DataFrame) -> tuple[str, str, int]:
         Tuple with course name, type of feedback and the feedback number
     
     """
-    course = list(set(df['CourseName'].to_list()))
-    if len(course) == 1:
-        course_name = course[0]
+    courses = df['CourseName'].unique()
+    if courses.size == 1:
+        course_name = courses[0]
     else:
         course_name = 'Multiple courses detected'
-    eval_title = list(set(df['EvalTitle'].to_list()))[0]
-    if eval_title.find('Large Group') != -1:
-        feedback_type = 'Large Group'
-    elif eval_title.find('Workshop/Lab') != -1:
-        feedback_type = 'Small Group'
-    else:
-        feedback_type = 'Feedback type not detected'
-    eval_name = list(set(df['EvalName'].to_list()))[0]
+    # All rows share the same evaluation, the UI filters by EvalTitle before processing
+    eval_title = df['EvalTitle'].iat[0]
+    feedback_type = next((value for (pattern, value) in FEEDBACK_TYPE_PATTERNS if pattern in eval_title), 'Feedback type not detected')
+    eval_name = df['EvalName'].iat[0]
     eval_name.strip()
     evaluation_number = int(eval_name[-1])
     return (course_name, feedback_type, evaluation_number)
 
+@st.cache_data(show_spinner=False, max_entries=10)
+def prepare_schedule(schedule_bytes: bytes) -> pd.DataFrame:
+    """
+    Reads the schedule and parses its dates and times.
+    Cached on the contents of the file so the schedule is only parsed once across Streamlit reruns.
+
+    Args:
+        schedule_bytes (bytes): contents of the schedule file (csv)
+
+    Returns:
+        DataFrame of the schedule with parsed dates and times
+    
+    """
+    schedule = pd.read_csv(io.BytesIO(schedule_bytes))
+    schedule['Date'] = pd.to_datetime(schedule['Date'], format='%Y-%m-%d', cache=True)
+    schedule['tFrom'] = pd.to_datetime(schedule['tFrom'], format='%I:%M %p', cache=True)
+    schedule['iLearningTypeID'] = schedule['iLearningTypeID'].astype('category')
+    return schedule
+
 def generate_schedule_for_evaluation(schedule: pd.DataFrame, evaluation_number: int, feedback_type: str) -> pd.DataFrame:
     """
     Generate a schedule of events that were assessed for the feedback type and number
 
     Args:
-        schedule (DataFrame): DataFrame of course schedule
+        schedule (DataFrame): DataFrame of course schedule from prepare_schedule
         evaluation_number (int): the number of the evaluation (mid-course or qualifier)
         feedback_type (str): the type of feedback (e.g, large-group or small-group)
 
@@ -68,36 +95,42 @@ def generate_schedule_for_evaluation(schedule: pd.DataFrame, evaluation_number:
         DataFrame of events which were assessed in the feedback
     
     """
-    schedule['Date'] = pd.to_datetime(schedule['Date'], format='%Y-%m-%d')
-    schedule['tFrom'] = pd.to_datetime(schedule['tFrom'], format='%I:%M %p')
-    schedule.sort_values(by=['Date', 'tFrom'], inplace=True)
-    schedule.reset_index(inplace=True)
-    assessments = schedule.loc[schedule['iLearningTypeID'].str.contains('Assessment')].index.to_list()
-    assessments.insert(0,0)
-    schedule_for_feedback = schedule[assessments[int(evaluation_number) - 1]:assessments[evaluation_number]]
+    evaluation_number = int(evaluation_number)
+    # Events are ordered by start time, ties broken by their row position, which matches
+    # a stable sort on Date and tFrom. Only the assessments are sorted to find the
+    # boundaries of the evaluation; the rest of the schedule is compared against them.
+    start_times = (schedule['Date'] + (schedule['tFrom'] - schedule['tFrom'].dt.normalize())).to_numpy()
+    positions = np.arange(len(schedule))
+    assessments = np.flatnonzero(schedule['iLearningTypeID'].str.contains('Assessment', regex=False, na=False).to_numpy())
+    assessments = assessments[np.argsort(start_times[assessments], kind='stable')]
+    end = assessments[evaluation_number - 1]
+    in_evaluation = (start_times < start_times[end]) | ((start_times == start_times[end]) & (positions < end))
+    if evaluation_number > 1:
+        start = assessments[evaluation_number - 2]
+        in_evaluation &= (start_times > start_times[start]) | ((start_times == start_times[start]) & (positions >= start))
+
     if feedback_type == 'Large Group':
-        schedule_for_feedback = schedule_for_feedback[schedule_for_feedback['iLearningTypeID'].isin(LARGE_GROUPS)]
+        in_evaluation &= schedule['iLearningTypeID'].isin(LARGE_GROUPS).to_numpy()
     elif feedback_type == 'Small Group':
-        schedule_for_feedback = schedule_for_feedback[schedule_for_feedback['iLearningTypeID'].isin(SMALL_GROUPS)]
+        in_evaluation &= schedule['iLearningTypeID'].isin(SMALL_GROUPS).to_numpy()
+    schedule_for_feedback = schedule[in_evaluation].sort_values(by=['Date', 'tFrom'], kind='stable')
     return schedule_for_feedback
 
-def generate_questions_from_evaluation(feedback: pd.DataFrame) -> list[str]:
+def generate_questions_from_evaluation(ratings_df: pd.DataFrame) -> list[str]:
     """
     Generates a list of questions in the feedback form that asks students for a rating
 
     Args:
-        feedback (DataFrame): feedback results
+        ratings_df (DataFrame): feedback results for questions that ask for a rating (QuestionType 'Radio')
 
     Returns:
         List[str]: list of questions from feedback results that ask for a rating
 
     """
-    # Get the questions that ask for a rating
-    ratings_df = feedback.loc[feedback['QuestionType'] == 'Radio']
-    radio_questions = list(set(ratings_df.loc[ratings_df['QuestionType'] == 'Radio']['QuestionText'].to_list()))
+    radio_questions = ratings_df['QuestionText'].unique().tolist()
 
     #Eliminate questions that ask about offensive remarks or mistreatment
-    questions_to_evaluate = [q for q in radio_questions if q.find('offensive remarks') == -1 and q.find('mistreatment') == -1]
+    questions_to_evaluate = [q for q in radio_questions if 'offensive remarks' not in q and 'mistreatment' not in q]
     return questions_to_evaluate
 
 def generate_faculty_names(feedback: pd.DataFrame) -> list[tuple]:
@@ -111,27 +144,29 @@ def generate_faculty_names(feedback: pd.DataFrame) -> list[tuple]:
     Returns:
         List[tuple]: list of names in format (last name, first name)
     """
-    first_name = feedback['EvaluateeFirst'].to_list()
-    last_name = feedback['EvaluateeLast'].to_list()
-    full_name = [(last_name[index], first) for index, first in enumerate(first_name)]
-    full_name = list(set(full_name))
-    full_name.sort()
+    unique_names = feedback[['EvaluateeLast', 'EvaluateeFirst']].drop_duplicates().sort_values(['EvaluateeLast', 'EvaluateeFirst'])
+    full_name = list(unique_names.itertuples(index=False, name=None))
     return(full_name)
 
-def convert_df_to_excel(ratings: pd.DataFrame):
+def convert_df_to_excel(ratings: pd.DataFrame, output=None):
 
     """
     Converts a DataFrame to an Excel file that can be downloaded
 
     Args:
         ratings (DataFrame): ratings of faculty for evaluations questions
+        output (file-like): file to write to, if not set the file is returned as bytes
         
     """
-    output = io.BytesIO()
-    ratings.to_excel(output)
-    return output.getvalue()
+    bio = io.BytesIO() if output is None else output
+    # xlsxwriter writes noticeably faster than openpyxl. constant_memory is left off
+    # because pandas writes cells column by column, which that mode does not support.
+    with pd.ExcelWriter(bio, engine='xlsxwriter') as writer:
+        ratings.to_excel(writer)
+    if output is None:
+        return bio.getvalue()
 
-def save_comments_to_docx(comments:list[dict], course:str, feedback_type:str):
+def save_comments_to_docx(comments:list[dict], course:str, feedback_type:str, output=None):
 
     """
     Writes a faculty names and their comments to a docx file
@@ -140,6 +175,7 @@ def save_comments_to_docx(comments:list[dict], course:str, feedback_type:str):
         comments(dict): list of dictionaries with Name and Comments as keys
         course(str): name of the course
         feedback_type(str): the type of feedback (large-group or small group)
+        output(file-like): file to write to, if not set the file is returned as bytes
     
     """
     doc = docx.Document()
@@ -151,15 +187,23 @@ def save_comments_to_docx(comments:list[dict], course:str, feedback_type:str):
         section.left_margin = Cm(1.0)
     doc.add_heading(course + ' - ' + feedback_type, 0)
     doc.add_heading('Comments for Faculty', 1)
+    # Comments are built as raw paragraph elements and inserted before the section
+    # properties, which skips creating a Paragraph wrapper for every comment
+    sect_pr = doc.element.body.sectPr
     for person in comments:
         doc.add_heading(person['Name'], 2)
         for comment in person['Comments']:
-            doc.add_paragraph(str(comment) + '\n')
+            p = OxmlElement('w:p')
+            r = OxmlElement('w:r')
+            r.text = str(comment) + '\n'
+            p.append(r)
+            sect_pr.addprevious(p)
             #doc.add_paragraph()
     #comments_file = doc.save(course + ' - '+feedback_type+' Comments.docx')
-    bio = io.BytesIO()
+    bio = io.BytesIO() if output is None else output
     doc.save(bio)
-    return bio.getvalue()
+    if output is None:
+        return bio.getvalue()
     
 
 def get_sessions_for_names(names:list[tuple], schedule: pd.DataFrame, sessions: pd.DataFrame) -> list[dict]:
@@ -177,134 +221,200 @@ def get_sessions_for_names(names:list[tuple], schedule: pd.DataFrame, sessions:
     
     """
     
-    faculty_sessions = []
-    schedule_ids = schedule['ID'].to_list()
-    schedule_ids.sort()
+    # Join each faculty-session pair to its title in the schedule once.
+    # The inner join drops sessions that are not in the schedule.
+    sched_names = schedule.drop_duplicates('ID').set_index('ID')['cName']
+    taught = sessions[['cLname', 'cFname', 'ID']].drop_duplicates()
+    titles = taught.join(sched_names, on='ID', how='inner').groupby(['cLname', 'cFname'], observed=True)['cName'].agg(list)
+    names_with_sessions = set(taught[['cLname', 'cFname']].itertuples(index=False, name=None))
 
+    faculty_sessions = []
     for name in names:
         last_name = name[0]
         first_name = name[1]
         full_name = first_name + ' ' + last_name
-        sessions_taught = sessions.loc[(sessions['cLname'] == last_name) & (sessions['cFname'] == first_name)]
-        session_ids = list(set(sessions_taught['ID'].to_list()))       
-        session_titles = []
-        
-        if len(session_ids) > 0:
-            for id in session_ids:
-                if id in schedule_ids:
-                    title = schedule.loc[schedule['ID'] == id]['cName'].to_list()[0]
-                    session_titles.append(title)
+        if name in names_with_sessions:
+            session_titles = titles.get(name, [])
         else:
             session_titles = ['No sessions found']
         faculty_sessions.append({'name': full_name, 'sessions': session_titles})
     return faculty_sessions
     
 
-def generate_ratings_and_comments_for_name(feedback: pd.DataFrame, name:tuple, questions_to_evaluate:list[str]) -> tuple[str, list, list[str]]:
+def generate_ratings_for_names(ratings_df: pd.DataFrame, names:list[tuple], questions_to_evaluate:list[str]) -> pd.DataFrame:
     
     """
-    Returns the name of faculty member, the ratings for that faculty member for the evaluation questions, and any comments about the faculty members
+    Returns the ratings of each faculty member for the evaluation questions
 
     Args:
-        feedback (DataFrame): feedback results
-        name (tuple): name of faculty members
-        questions_to_evaluation (list): list of questions in feedback results that ask for a rating
+        ratings_df (DataFrame): feedback results for questions that ask for a rating (QuestionType 'Radio')
+        names (list): faculty names stored in tuples
+        questions_to_evaluate (list): list of questions in feedback results that ask for a rating
 
     Return:
-        tuple[str, list, list]: (name of faculty, list of ratings, list of comments)
+        DataFrame: ratings indexed by faculty name with a column for each statistic of each question
     
     """
 
-    ratings = []
-    last_name = name[0]
-    first_name = name[1]
-    name = first_name + ' ' + last_name
-    temp_df = feedback.loc[(feedback['EvaluateeLast'] == last_name) & (feedback['EvaluateeFirst']==first_name)]
-    for question in questions_to_evaluate:
-        question_df = temp_df.loc[temp_df['QuestionText'] == question]
-        responses = question_df['ResponseValue'].to_list()
-        non_zero_responses = [response for response in responses if response > 0.0]
-        if len(non_zero_responses) > 0:
-            avg = round(sum(non_zero_responses)/len(non_zero_responses), 1)
-            #std = float(round(np.std(non_zero_responses), 1))
-            strongly_agree_or_agree_percent = round(((non_zero_responses.count(5.0) + non_zero_responses.count(4.0))/len(non_zero_responses)), 3) * 100
-            poor_or_below_average_percent = round(((non_zero_responses.count(1.0) + non_zero_responses.count(2.0))/len(non_zero_responses)), 3) * 100
-        else:
-            avg = None
-            #std = None
-            strongly_agree_or_agree_percent = None
-            poor_or_below_average_percent = None
-        
-        ratings.append(avg)
-        ratings.append(len(non_zero_responses))
-        ratings.append(strongly_agree_or_agree_percent)
-        ratings.append(poor_or_below_average_percent)
+    responses = ratings_df['ResponseValue'].to_numpy()
+    rv = ratings_df.loc[responses > 0]
+    responses = rv['ResponseValue'].to_numpy()
+    is_pos = (responses == 4.0) | (responses == 5.0)
+    is_neg = (responses == 1.0) | (responses == 2.0)
+
+    # Map every response to a single (faculty, question) cell code and accumulate
+    # the sums for all cells in one pass over the rows with np.bincount
+    name_index = pd.MultiIndex.from_arrays([[name[0] for name in names], [name[1] for name in names]])
+    name_codes = name_index.get_indexer(pd.MultiIndex.from_arrays([rv['EvaluateeLast'], rv['EvaluateeFirst']]))
+    question_codes = pd.Index(questions_to_evaluate).get_indexer(rv['QuestionText'])
+    keep = (name_codes >= 0) & (question_codes >= 0)
+    cell_codes = name_codes[keep] * len(questions_to_evaluate) + question_codes[keep]
+    n_cells = len(names) * len(questions_to_evaluate)
+    count = np.bincount(cell_codes, minlength=n_cells)
+    total = np.bincount(cell_codes, weights=responses[keep], minlength=n_cells)
+    pos = np.bincount(cell_codes, weights=is_pos[keep], minlength=n_cells)
+    neg = np.bincount(cell_codes, weights=is_neg[keep], minlength=n_cells)
+    with np.errstate(invalid='ignore'):
+        avg = total / count
+        pos_share = pos / count
+        neg_share = neg / count
+    # Python round rounds the stored float exactly while np.round scales first and can
+    # land on the other side of a half (4.65 -> 4.6), so round the Python floats.
+    # Cells without responses are NaN and stay NaN.
+    avg = np.array([round(x, 1) for x in avg.tolist()])
+    strongly_agree_or_agree_percent = np.array([round(x, 3) * 100 for x in pos_share.tolist()])
+    poor_or_below_average_percent = np.array([round(x, 3) * 100 for x in neg_share.tolist()])
+
+    # One row per faculty member and one column per (question, statistic)
+    cols = pd.MultiIndex.from_product([questions_to_evaluate, ['Average Rating', 'Count', 'Percent Strongly Agree or Agree', 'Percent Disagree or Strongly Disagree']])
+    values = np.stack([avg, count, strongly_agree_or_agree_percent, poor_or_below_average_percent], axis=-1)
+    ratings = pd.DataFrame(values.reshape(len(names), len(cols)), columns=cols)
+    count_cols = cols[cols.get_level_values(1) == 'Count']
+    ratings[count_cols] = ratings[count_cols].astype(int)
+    ratings.index = [first_name + ' ' + last_name for (last_name, first_name) in names]
+    return ratings
+
+def generate_comments_for_names(comments_df: pd.DataFrame, names:list[tuple]) -> list[dict]:
     
-    faculty_comments = temp_df.loc[temp_df['QuestionType'] == 'Text']['ResponseText'].to_list()
-    faculty_comments = [comment for comment in faculty_comments if type(comment) is str and comment.find('-----') == -1]
-    if len(faculty_comments) > 0:
-        comments = faculty_comments
-    else:
-        comments = ['No comments']
+    """
+    Returns the comments about each faculty member
+
+    Args:
+        comments_df (DataFrame): feedback results for free-text questions (QuestionType 'Text')
+        names (list): faculty names stored in tuples
+
+    Return:
+        List[dict]: list of dictionaries with Name and Comments as keys
     
-    return (name, ratings, comments)
+    """
+
+    # Keep text responses that are strings and are not separator lines. The string rows
+    # are selected first because .str raises on a column that holds no strings.
+    text_df = comments_df.loc[comments_df['ResponseText'].map(type).eq(str).to_numpy()]
+    text_df = text_df.loc[~text_df['ResponseText'].astype(object).str.contains(COMMENT_SEPARATOR, regex=False).to_numpy()]
+    grouped = text_df.groupby(['EvaluateeLast', 'EvaluateeFirst'], observed=True)['ResponseText'].apply(list)
+
+    comments = []
+    for (last_name, first_name) in names:
+        faculty_comments = grouped.get((last_name, first_name), [])
+        if len(faculty_comments) == 0:
+            faculty_comments = ['No comments']
+        comments.append({'Name': first_name + ' ' + last_name, 'Comments': faculty_comments})
+    return comments
 
-def process_feedback_data(feedback: pd.DataFrame, schedule: pd.DataFrame = None, faculty: pd.DataFrame = None):
+@st.cache_data(show_spinner=False, max_entries=10)
+def generate_feedback_files(feedback_bytes: bytes, eval_title: str, course: str, feedback_type: str, feedback_number: int, schedule_bytes: bytes = None, faculty_bytes: bytes = None) -> tuple[bytes, str]:
 
     """
-    Writes ratings for faculty to a Excel file and comments to docx file
+    Generates a zip file with the ratings Excel file and comments docx file for the feedback.
+    Cached on the contents of the uploaded files so that Streamlit reruns with the same
+    inputs reuse the results.
 
     Args:
-        feedback_loc (str): location of the feedback file (csv)
-        schedule_loc (str): location of the schedule file (csv)
-        faculty_loc (str): location of the faculty-sessions file (csv)
+        feedback_bytes (bytes): contents of the feedback file (csv)
+        eval_title (str): title of the evaluation in the feedback file to process
+        course (str): name of the course
+        feedback_type (str): the type of feedback (large-group or small group)
+        feedback_number (int): the number of the evaluation
+        schedule_bytes (bytes): contents of the schedule file (csv)
+        faculty_bytes (bytes): contents of the faculty-sessions file (csv)
+
+    Returns:
+        tuple[bytes, str]: (zip file, name of the zip file)
     
     """
 
-    #feedback = pd.read_csv(feedback_loc)
-    #(course, feedback_type, feedback_number) = generate_feedback_info(feedback)
-    questions = generate_questions_from_evaluation(feedback)   
+    feedback = pd.read_csv(io.BytesIO(feedback_bytes), dtype=FEEDBACK_DTYPES)
+    feedback = feedback.loc[feedback['EvalTitle'] == eval_title]
+
+    # Split the feedback into rating and comment rows once and share the slices
+    question_type = feedback['QuestionType'].values
+    ratings_df = feedback[question_type == 'Radio']
+    comments_df = feedback[question_type == 'Text']
+    questions = generate_questions_from_evaluation(ratings_df)   
     full_names = generate_faculty_names(feedback)
+    # The full upload is no longer needed once it is split, drop it before building the files
+    del feedback, question_type
     
     # Check if locations for schedule and faculty teaching are set.
     # If the are sent generate a list of dictionaries that contain
     # the name of the faculty member and the titles of the sessions
     # they taught.
-    if schedule is not None and faculty is not None:
+    if schedule_bytes is not None and faculty_bytes is not None:
+        schedule = prepare_schedule(schedule_bytes)
+        faculty = pd.read_csv(io.BytesIO(faculty_bytes))
         schedule_for_eval = generate_schedule_for_evaluation(schedule, feedback_number, feedback_type)
         sessions_taught = get_sessions_for_names(full_names, schedule_for_eval, faculty)
+        del schedule, faculty, schedule_for_eval
     else:
         sessions_taught = None
 
-    faculty_ratings = []
-    faculty_comments = []
-    names_for_dataframe = []
+    values_and_counts_df = generate_ratings_for_names(ratings_df, full_names, questions)
+    faculty_comments = generate_comments_for_names(comments_df, full_names)
+    del ratings_df, comments_df
     sessions = []
-    for name in full_names:
-        (faculty_name, ratings, comments) = generate_ratings_and_comments_for_name(feedback, name, questions)
-        names_for_dataframe.append(faculty_name)
-        faculty_ratings.append(ratings)
-        faculty_comments.append({'Name': faculty_name, 'Comments': comments})
-        if sessions_taught is not None:
-            faculty_sessions = [[session for session in item['sessions']] for item in sessions_taught if item['name'] == faculty_name][0]
-            sessions.append(', '.join(faculty_sessions))
-
-    cols = pd.MultiIndex.from_product([questions, ['Average Rating', 'Count', 'Percent Strongly Agree or Agree', 'Percent Disagree or Strongly Disagree']])
-    values_and_counts_df = pd.DataFrame(faculty_ratings, index=names_for_dataframe, columns= cols)
-    
+    if sessions_taught is not None:
+        sess_map = {item['name']: item['sessions'] for item in sessions_taught}
+        for faculty_name in values_and_counts_df.index:
+            sessions.append(', '.join(sess_map[faculty_name]))
+
     if len(sessions) == len(values_and_counts_df):
         values_and_counts_df.insert(loc=len(values_and_counts_df.columns), column='Sessions', value = sessions)
-    st.header("Download Files")
+
+    # Stream each file straight into its zip entry so the workbook and document
+    # are never held in memory next to the finished zip.
+    # xlsx and docx files are already zip-compressed, so store them without recompressing
     buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'x', compression=zipfile.ZIP_STORED) as results:
+        with results.open('Ratings.xlsx', 'w') as ratings_file:
+            convert_df_to_excel(values_and_counts_df, ratings_file)
+        del values_and_counts_df
+        with results.open('Comments.docx', 'w') as comments_file:
+            save_comments_to_docx(faculty_comments, course, feedback_type, comments_file)
+    return (buf.getvalue(), course + ' ' + feedback_type + ' Feedback.zip')
+
+def process_feedback_data(feedback_bytes: bytes, eval_title: str, schedule_bytes: bytes = None, faculty_bytes: bytes = None):
+
+    """
+    Writes ratings for faculty to a Excel file and comments to docx file
+
+    Args:
+        feedback_bytes (bytes): contents of the feedback file (csv)
+        eval_title (str): title of the evaluation in the feedback file to process
+        schedule_bytes (bytes): contents of the schedule file (csv)
+        faculty_bytes (bytes): contents of the faculty-sessions file (csv)
+    
+    """
 
-    with zipfile.ZipFile(buf, 'x') as results:
-        results.writestr('Ratings.xlsx', convert_df_to_excel(values_and_counts_df))
-        results.writestr('Comments.docx', save_comments_to_docx(faculty_comments, course, feedback_type))
+    #feedback = pd.read_csv(feedback_loc)
+    #(course, feedback_type, feedback_number) = generate_feedback_info(feedback)
+    (zip_file, zip_name) = generate_feedback_files(feedback_bytes, eval_title, course, feedback_type, feedback_number, schedule_bytes, faculty_bytes)
+    st.header("Download Files")
     
     st.download_button(
         label='Download Results',
-        data=buf.getvalue(),
-        file_name= course+ ' '+feedback_type+' Feedback.zip',
+        data=zip_file,
+        file_name=zip_name,
         mime='application/zip'
     )
 
@@ -318,7 +428,7 @@ if __name__ == '__main__':
     feedback_file = st.file_uploader('')
     if feedback_file is not None:
         try:
-            feedback_df = pd.read_csv(feedback_file)
+            feedback_df = pd.read_csv(feedback_file, dtype=FEEDBACK_DTYPES)
         except pd.errors.ParserError:
             st.subheader("Could not parse the file. Please check the formating of the file.")
         except Exception as e:
@@ -327,15 +437,14 @@ if __name__ == '__main__':
         missing_columns = [item for item in DATA_COLUMNS if item not in columns]
         if len(missing_columns) > 0:
             st.write('The file is missing these columns: ' + ', '.join(missing_columns) + '. Please check the file.')
-        eval_titles = list(set(feedback_df['EvalTitle'].to_list()))
+        eval_titles = feedback_df['EvalTitle'].unique().tolist()
         if len(eval_titles) > 1:
             selected_title = st.selectbox('The file contains data from more than one evaluation. Please select which evaluation you would like to process: ', eval_titles)
-            data_to_process = feedback_df.loc[feedback_df['EvalTitle'] == selected_title]
-            #st.dataframe(data_to_process)
-            st.button('Process File', on_click=process_feedback_data, args=[data_to_process])
+            #st.dataframe(feedback_df.loc[feedback_df['EvalTitle'] == selected_title])
+            st.button('Process File', on_click=process_feedback_data, args=[feedback_file.getvalue(), selected_title])
         else:
             st.dataframe(feedback_df)
-            st.button('Process File', on_click=process_feedback_data, args=[feedback_df])
+            st.button('Process File', on_click=process_feedback_data, args=[feedback_file.getvalue(), eval_titles[0]])
 
         
 
@@ -8,5 +8,5 @@ setup(
     author_email='peter.takizawa@gmail.com',
     description='Summarizes feedback from BlueDogs',
     packages=find_packages(),    
-    install_requires=["pandas >=2.2.3", "streamlit >= 1.44.1", "python-docx >= 1.1.2",],
+    install_requires=["pandas >=2.2.3", "numpy >= 2.2.4", "streamlit >= 1.44.1", "python-docx >= 1.1.2", "xlsxwriter >= 3.2.2",],
 )